@@ -5,145 +5,113 @@ api/analyze.py - Simple Sentiment Analysis API for Vercel
 ========================================================
 """
 
-import json
-from datetime import datetime
+import functools
 from http.server import BaseHTTPRequestHandler
 
+from api_utils import KEEPALIVE_TIMEOUT, MAX_BODY_SIZE, dump_json, load_json, now_iso, read_body
+from lexicon import score_text, sentiment_code
+
+# Number of distinct texts whose scores are memoized
+CACHE_SIZE = 4096
+
+# Only texts up to this many characters are memoized, which bounds the
+# cache to a few MiB however many unique texts clients send
+MAX_CACHED_TEXT_LENGTH = 256
+
 
 class SimpleSentimentAnalyzer:
     """Simple sentiment analyzer using word lists"""
 
-    def __init__(self):
-        self.positive_words = {
-            "good",
-            "great",
-            "excellent",
-            "amazing",
-            "wonderful",
-            "fantastic",
-            "awesome",
-            "love",
-            "like",
-            "enjoy",
-            "happy",
-            "pleased",
-            "satisfied",
-            "delighted",
-            "perfect",
-            "outstanding",
-            "superb",
-            "brilliant",
-            "magnificent",
-            "terrific",
-            "best",
-            "favorite",
-            "recommend",
-            "impressed",
-            "beautiful",
-            "nice",
-            "positive",
-            "fresh",
-            "delicious",
-            "tasty",
-            "quality",
-            "fast",
-            "helpful",
-            "incredible",
-            "extraordinary",
-        }
+    # Response skeletons; analyze() copies one and fills in per-call fields.
+    # "confidence" is kept in place so the key order of responses is stable.
+    _EMPTY = {
+        "sentiment": "neutral",
+        "confidence": 0.0,
+        "message": "Empty text",
+        "emoji": "😐",
+    }
+    _NO_SENTIMENT = {
+        "sentiment": "neutral",
+        "confidence": 0.5,
+        "message": "Neutral sentiment detected",
+        "emoji": "😐",
+    }
+    _POSITIVE = {
+        "sentiment": "positive",
+        "confidence": 0.0,
+        "message": "Positive sentiment detected!",
+        "emoji": "😊",
+    }
+    _NEGATIVE = {
+        "sentiment": "negative",
+        "confidence": 0.0,
+        "message": "Negative sentiment detected!",
+        "emoji": "😞",
+    }
+    _NEUTRAL = {
+        "sentiment": "neutral",
+        "confidence": 0.0,
+        "message": "Neutral sentiment detected",
+        "emoji": "😐",
+    }
+    # Indexed by lexicon sentiment code (POSITIVE, NEGATIVE, NEUTRAL)
+    _TEMPLATES = (_POSITIVE, _NEGATIVE, _NEUTRAL)
 
-        self.negative_words = {
-            "bad",
-            "terrible",
-            "awful",
-            "horrible",
-            "disgusting",
-            "hate",
-            "dislike",
-            "disappointed",
-            "unsatisfied",
-            "unhappy",
-            "angry",
-            "frustrated",
-            "annoyed",
-            "worst",
-            "poor",
-            "cheap",
-            "broken",
-            "defective",
-            "useless",
-            "waste",
-            "negative",
-            "slow",
-            "expensive",
-            "rude",
-            "dirty",
-            "stale",
-            "bland",
-            "bitter",
-            "sour",
-            "wrong",
-            "failed",
-            "problem",
-            "issue",
-            "complaint",
-            "disaster",
-            "dreadful",
-        }
+    def __init__(self):
+        # Repeated submissions (demos, retries) skip re-scoring entirely
+        self._analyze_cached = functools.lru_cache(maxsize=CACHE_SIZE)(
+            self._analyze_core
+        )
 
     def analyze(self, text):
         """Analyze sentiment of text"""
-        if not text or not text.strip():
-            return {
-                "sentiment": "neutral",
-                "confidence": 0.0,
-                "message": "Empty text",
-                "emoji": "😐",
-            }
-
-        words = text.lower().split()
-        positive_count = sum(1 for word in words if word in self.positive_words)
-        negative_count = sum(1 for word in words if word in self.negative_words)
+        if not text or text.isspace():
+            return self._EMPTY.copy()
+
+        (
+            template,
+            confidence,
+            word_count,
+            positive_count,
+            negative_count,
+        ) = (
+            self._analyze_cached(text)
+            if len(text) <= MAX_CACHED_TEXT_LENGTH
+            else self._analyze_core(text)
+        )
+
+        result = template.copy()
+        if positive_count + negative_count == 0:
+            return result
+
+        result["confidence"] = confidence
+        result["metadata"] = {
+            "text_length": len(text),
+            "word_count": word_count,
+            "positive_words": positive_count,
+            "negative_words": negative_count,
+            "timestamp": now_iso(),
+        }
+        return result
 
+    def _analyze_core(self, text):
+        """Score text without per-call fields; short texts are memoized"""
+        positive_count, negative_count, word_count = score_text(text)
         total_sentiment_words = positive_count + negative_count
 
         if total_sentiment_words == 0:
-            return {
-                "sentiment": "neutral",
-                "confidence": 0.5,
-                "message": "Neutral sentiment detected",
-                "emoji": "😐",
-            }
-
-        sentiment_score = (positive_count - negative_count) / len(words)
-        confidence = min(1.0, total_sentiment_words / max(1, len(words)) + 0.3)
-
-        if sentiment_score > 0.05:
-            sentiment = "positive"
-            message = "Positive sentiment detected!"
-            emoji = "😊"
-        elif sentiment_score < -0.05:
-            sentiment = "negative"
-            message = "Negative sentiment detected!"
-            emoji = "😞"
-        else:
-            sentiment = "neutral"
-            message = "Neutral sentiment detected"
-            emoji = "😐"
-
-        return {
-            "sentiment": sentiment,
-            "confidence": round(confidence, 3),
-            "message": message,
-            "emoji": emoji,
-            "metadata": {
-                "text_length": len(text),
-                "word_count": len(words),
-                "positive_words": positive_count,
-                "negative_words": negative_count,
-                "timestamp": datetime.now().isoformat(),
-            },
-        }
+            return self._NO_SENTIMENT, 0.5, word_count, 0, 0
+
+        confidence = min(1.0, total_sentiment_words / word_count + 0.3)
+        code = sentiment_code(positive_count, negative_count, word_count)
+
+        return (
+            self._TEMPLATES[code],
+            round(confidence, 3),
+            word_count,
+            positive_count,
+            negative_count,
+        )
 
 
 # Initialize analyzer
@@ -151,10 +119,18 @@ analyzer = SimpleSentimentAnalyzer()
 
 
 class handler(BaseHTTPRequestHandler):
-    def _set_headers(self, status_code=200):
+    # HTTP/1.1 keeps the connection open between requests; every response
+    # must therefore carry a Content-Length
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
+    def _set_headers(self, status_code=200, content_length=0):
         """Set response headers"""
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(content_length))
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
@@ -162,9 +138,9 @@ class handler(BaseHTTPRequestHandler):
 
     def _send_json(self, data, status_code=200):
         """Send JSON response"""
-        self._set_headers(status_code)
-        response = json.dumps(data, ensure_ascii=False)
-        self.wfile.write(response.encode("utf-8"))
+        body = dump_json(data)
+        self._set_headers(status_code, len(body))
+        self.wfile.write(body)
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
@@ -175,15 +151,24 @@ class handler(BaseHTTPRequestHandler):
         try:
             # Read request body
             content_length = int(self.headers.get("Content-Length", 0))
-            if content_length == 0:
+            if content_length <= 0:
+                # A body may still follow (e.g. chunked), so don't reuse
+                self.close_connection = True
                 self._send_json({"error": "No data provided"}, 400)
                 return
 
-            post_data = self.rfile.read(content_length)
+            if content_length > MAX_BODY_SIZE:
+                # The body is left unread, so the connection can't be reused
+                self.close_connection = True
+                self._send_json({"error": "Request body too large"}, 413)
+                return
+
+            post_data = read_body(self.rfile, content_length)
 
             try:
-                data = json.loads(post_data.decode("utf-8"))
-            except json.JSONDecodeError:
+                data = load_json(post_data)
+            except ValueError:
+                # JSONDecodeError (stdlib and orjson) and UnicodeDecodeError
                 self._send_json({"error": "Invalid JSON"}, 400)
                 return
 
@@ -193,7 +178,9 @@ class handler(BaseHTTPRequestHandler):
                 return
 
             text = data["text"]
-            if not isinstance(text, str) or not text.strip():
+
+            # isspace() checks for blank input without copying the text
+            if not isinstance(text, str) or not text or text.isspace():
                 self._send_json({"error": "Text must be a non-empty string"}, 400)
                 return
 
@@ -202,6 +189,7 @@ class handler(BaseHTTPRequestHandler):
             self._send_json(result)
 
         except Exception as e:
+            self.close_connection = True
             self._send_json({"error": "Internal server error", "message": str(e)}, 500)
 
 
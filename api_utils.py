@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+api_utils.py - Shared request/response helpers for the sentiment APIs
+====================================================================
+Imported by both analyze.py and app.py so the helpers are defined once
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Seconds an idle keep-alive connection may hold the single-threaded server
+# before it is dropped
+KEEPALIVE_TIMEOUT = 5
+
+# Largest accepted request body; bigger payloads are rejected with 413
+MAX_BODY_SIZE = 64 * 1024
+
+# Reused for every request body. The handler serves one request at a time,
+# and parsing copies what it keeps out of the buffer.
+_body_buffer = bytearray(MAX_BODY_SIZE)
+
+
+def read_body(rfile, length):
+    """Read a request body into the shared buffer without allocating"""
+    view = memoryview(_body_buffer)[:length]
+    received = rfile.readinto(view) or 0
+    return view[:received]
+
+
+# [epoch second, formatted timestamp] shared by all requests in that second
+_timestamp_cache = [0, ""]
+
+
+def now_iso():
+    """Current UTC time in ISO 8601, formatted at most once per second"""
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        # Write the string before the key so readers never pair a new key
+        # with a stale string
+        _timestamp_cache[1] = datetime.fromtimestamp(now, timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        _timestamp_cache[0] = now
+    return _timestamp_cache[1]
+
+
+def _json_default(obj):
+    """Serialize values orjson rejects but the stdlib encoder accepts"""
+    # Float subclasses such as numpy.float64 (typical model scores)
+    if isinstance(obj, float):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dump_json(data):
+    """Serialize data to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(
+            data, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_json(data):
+    """Parse JSON from a UTF-8 bytes-like object"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(str(data, "utf-8"))
@@ -9,115 +9,61 @@ File: index.py
 Location: Root directory
 """
 
-import json
 import os
-from datetime import datetime
+import threading
 from http.server import BaseHTTPRequestHandler
 import urllib.parse
 
-# Import our sentiment analysis engine
-from sentiment_engine import EmotionEvaluator
+from api_utils import KEEPALIVE_TIMEOUT, MAX_BODY_SIZE, dump_json, load_json, now_iso, read_body
+from lexicon import NEUTRAL, score_text, sentiment_code
+
+
+# Index into the emoji/message tuples below for evaluator labels other than
+# the lexicon's POSITIVE/NEGATIVE/NEUTRAL codes
+UNKNOWN = 3
+
+SENTIMENTS = ("positive", "negative", "neutral")
+SENTIMENT_INDEX = {label: index for index, label in enumerate(SENTIMENTS)}
+EMOJIS = ("😊", "😞", "😐", "🤔")
+MESSAGES = (
+    "Positive sentiment detected!",
+    "Negative sentiment detected!",
+    "Neutral sentiment detected",
+    "Sentiment analyzed",
+)
+
+
+def build_response(index, confidence, text, word_count, method, label=None):
+    """Build the analysis response returned to the frontend"""
+    # label overrides the reported sentiment, e.g. an evaluator label that
+    # maps to UNKNOWN
+    return {
+        "sentiment": SENTIMENTS[index] if label is None else label,
+        "confidence": confidence,
+        "message": MESSAGES[index],
+        "emoji": EMOJIS[index],
+        "scores": {
+            "confidence": confidence,
+            "confidence_percentage": round(confidence * 100, 1),
+        },
+        "metadata": {
+            "text_length": len(text),
+            "word_count": word_count,
+            "analysis_timestamp": now_iso(),
+            "api_version": "1.0",
+            "method": method,
+            "platform": "Vercel Serverless",
+        },
+    }
 
 
 class SimpleSentimentAnalyzer:
     """Fallback sentiment analyzer using basic word lists"""
 
-    def __init__(self):
-        self.positive_words = {
-            "good",
-            "great",
-            "excellent",
-            "amazing",
-            "wonderful",
-            "fantastic",
-            "awesome",
-            "love",
-            "like",
-            "enjoy",
-            "happy",
-            "pleased",
-            "satisfied",
-            "delighted",
-            "perfect",
-            "outstanding",
-            "superb",
-            "brilliant",
-            "magnificent",
-            "terrific",
-            "best",
-            "favorite",
-            "recommend",
-            "impressed",
-            "beautiful",
-            "nice",
-            "positive",
-            "fresh",
-            "delicious",
-            "tasty",
-            "quality",
-            "fast",
-            "helpful",
-            "incredible",
-            "extraordinary",
-            "remarkable",
-            "spectacular",
-            "marvelous",
-            "phenomenal",
-            "splendid",
-        }
-
-        self.negative_words = {
-            "bad",
-            "terrible",
-            "awful",
-            "horrible",
-            "disgusting",
-            "hate",
-            "dislike",
-            "disappointed",
-            "unsatisfied",
-            "unhappy",
-            "angry",
-            "frustrated",
-            "annoyed",
-            "worst",
-            "poor",
-            "cheap",
-            "broken",
-            "defective",
-            "useless",
-            "waste",
-            "negative",
-            "slow",
-            "expensive",
-            "rude",
-            "dirty",
-            "stale",
-            "bland",
-            "bitter",
-            "sour",
-            "wrong",
-            "failed",
-            "problem",
-            "issue",
-            "complaint",
-            "disaster",
-            "dreadful",
-            "appalling",
-            "atrocious",
-            "deplorable",
-            "detestable",
-            "ghastly",
-            "hideous",
-            "loathsome",
-            "miserable",
-            "nasty",
-            "revolting",
-        }
-
-    def analyze_text(self, text):
+    @staticmethod
+    def analyze_text(text):
         """Simple sentiment analysis"""
-        if not text or not text.strip():
+        if not text or text.isspace():
             return {
                 "sentiment": "neutral",
                 "confidence": 0.0,
@@ -125,63 +71,74 @@ class SimpleSentimentAnalyzer:
                 "emoji": "😐",
             }
 
-        words = text.lower().split()
-        positive_count = sum(1 for word in words if word in self.positive_words)
-        negative_count = sum(1 for word in words if word in self.negative_words)
-
+        positive_count, negative_count, word_count = score_text(text)
         total_sentiment_words = positive_count + negative_count
 
         if total_sentiment_words == 0:
-            return {
-                "sentiment": "neutral",
-                "confidence": 0.5,
-                "message": "Neutral sentiment detected",
-                "emoji": "😐",
-            }
+            return build_response(NEUTRAL, 0.5, text, word_count, "SimpleFallback")
+
+        confidence = min(1.0, total_sentiment_words / word_count + 0.3)
+
+        return build_response(
+            sentiment_code(positive_count, negative_count, word_count),
+            round(confidence, 3),
+            text,
+            word_count,
+            "SimpleFallback",
+        )
 
-        sentiment_score = (positive_count - negative_count) / len(words)
-        confidence = min(1.0, total_sentiment_words / max(1, len(words)) + 0.3)
-
-        if sentiment_score > 0.05:
-            sentiment = "positive"
-            message = "Positive sentiment detected!"
-            emoji = "😊"
-        elif sentiment_score < -0.05:
-            sentiment = "negative"
-            message = "Negative sentiment detected!"
-            emoji = "😞"
-        else:
-            sentiment = "neutral"
-            message = "Neutral sentiment detected"
-            emoji = "😐"
-
-        return {
-            "sentiment": sentiment,
-            "confidence": round(confidence, 3),
-            "message": message,
-            "emoji": emoji,
-            "scores": {
-                "confidence": round(confidence, 3),
-                "confidence_percentage": round(confidence * 100, 1),
-            },
-            "metadata": {
-                "text_length": len(text),
-                "word_count": len(words),
-                "analysis_timestamp": datetime.now().isoformat(),
-                "api_version": "1.0",
-                "method": "SimpleFallback",
-            },
-        }
 
+# Full evaluator, loaded on first use: None = not loaded yet, False = failed
+_evaluator = None
+_evaluator_lock = threading.Lock()
 
-# Initialize evaluator
-try:
-    evaluator = EmotionEvaluator()
-except Exception:
-    evaluator = None
+
+def get_evaluator():
+    """Return the shared EmotionEvaluator, or None if it can't be loaded"""
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                try:
+                    # Import our sentiment analysis engine (slow: loads the model)
+                    from sentiment_engine import EmotionEvaluator
+
+                    _evaluator = EmotionEvaluator()
+                except Exception:
+                    _evaluator = False
+    return _evaluator or None
+
+
+# Load the model in the background so a cold start can answer /health at once
+threading.Thread(target=get_evaluator, daemon=True).start()
+
+# Fallback used when the full evaluator is unavailable
+fallback_analyzer = SimpleSentimentAnalyzer()
+
+
+# Health check bodies keyed by evaluator availability, split around their
+# only per-request field (the timestamp)
+_HEALTH_PREFIXES = {
+    available: dump_json(
+        {
+            "status": "healthy",
+            "version": "1.0",
+            "evaluator_available": available,
+            "platform": "Vercel Serverless",
+        }
+    )[:-1]
+    + b',"timestamp":"'
+    for available in (False, True)
+}
+_HEALTH_SUFFIX = b'"}'
 
 
 class handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connection open between requests; every response
+    # must therefore carry a Content-Length
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
     def _set_cors_headers(self):
         """Set CORS headers for API responses"""
         self.send_header("Access-Control-Allow-Origin", "*")
@@ -190,19 +147,25 @@ class handler(BaseHTTPRequestHandler):
 
     def _send_json_response(self, data, status_code=200):
         """Send JSON response with proper headers"""
+        self._send_json_body(dump_json(data), status_code)
+
+    def _send_json_body(self, body, status_code=200):
+        """Send already-serialized JSON bytes with proper headers"""
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self._set_cors_headers()
         self.end_headers()
 
-        response = json.dumps(data, ensure_ascii=False, indent=2)
-        self.wfile.write(response.encode("utf-8"))
+        self.wfile.write(body)
 
     def _send_error_response(self, message, status_code=400):
         """Send error response"""
         error_data = {
             "error": message,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "status_code": status_code,
         }
         self._send_json_response(error_data, status_code)
@@ -210,6 +173,7 @@ class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
         self.send_response(200)
+        self.send_header("Content-Length", "0")
         self._set_cors_headers()
         self.end_headers()
 
@@ -218,14 +182,11 @@ class handler(BaseHTTPRequestHandler):
         path = self.path.split("?")[0]
 
         if path in ["/api/health", "/health"]:
-            health_data = {
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat(),
-                "version": "1.0",
-                "evaluator_available": evaluator is not None,
-                "platform": "Vercel Serverless",
-            }
-            self._send_json_response(health_data)
+            self._send_json_body(
+                _HEALTH_PREFIXES[bool(_evaluator)]
+                + now_iso().encode("ascii")
+                + _HEALTH_SUFFIX
+            )
         else:
             self._send_error_response("Endpoint not found", 404)
 
@@ -234,6 +195,8 @@ class handler(BaseHTTPRequestHandler):
         path = self.path.split("?")[0]
 
         if path not in ["/api/analyze", "/analyze"]:
+            # The body is left unread, so the connection can't be reused
+            self.close_connection = True
             self._send_error_response("Endpoint not found", 404)
             return
 
@@ -241,16 +204,24 @@ class handler(BaseHTTPRequestHandler):
             # Get content length
             content_length = int(self.headers.get("Content-Length", 0))
 
-            if content_length == 0:
+            if content_length <= 0:
+                # A body may still follow (e.g. chunked), so don't reuse
+                self.close_connection = True
                 self._send_error_response("No data provided")
                 return
 
+            if content_length > MAX_BODY_SIZE:
+                self.close_connection = True
+                self._send_error_response("Request body too large", 413)
+                return
+
             # Read request body
-            post_data = self.rfile.read(content_length)
+            post_data = read_body(self.rfile, content_length)
 
             try:
-                data = json.loads(post_data.decode("utf-8"))
-            except json.JSONDecodeError:
+                data = load_json(post_data)
+            except ValueError:
+                # JSONDecodeError (stdlib and orjson) and UnicodeDecodeError
                 self._send_error_response("Invalid JSON format")
                 return
 
@@ -261,11 +232,13 @@ class handler(BaseHTTPRequestHandler):
 
             text = data["text"]
 
-            if not isinstance(text, str) or not text.strip():
+            # isspace() checks for blank input without copying the text
+            if not isinstance(text, str) or not text or text.isspace():
                 self._send_error_response("Text must be a non-empty string")
                 return
 
             # Perform sentiment analysis
+            evaluator = get_evaluator()
             if evaluator:
                 # Use the full emotion evaluator if available
                 result = evaluator.analyze_text(text)
@@ -273,48 +246,29 @@ class handler(BaseHTTPRequestHandler):
                 # Format for frontend
                 if "error" not in result:
                     sentiment = result["sentiment"].lower()
-                    confidence = result["confidence"]
-
-                    emoji_map = {"positive": "😊", "negative": "😞", "neutral": "😐"}
-                    message_map = {
-                        "positive": "Positive sentiment detected!",
-                        "negative": "Negative sentiment detected!",
-                        "neutral": "Neutral sentiment detected",
-                    }
-
-                    formatted_result = {
-                        "sentiment": sentiment,
-                        "confidence": confidence,
-                        "message": message_map.get(sentiment, "Sentiment analyzed"),
-                        "emoji": emoji_map.get(sentiment, "🤔"),
-                        "scores": {
-                            "confidence": confidence,
-                            "confidence_percentage": round(confidence * 100, 1),
-                        },
-                        "metadata": {
-                            "text_length": len(text),
-                            "word_count": len(text.split()),
-                            "analysis_timestamp": datetime.now().isoformat(),
-                            "api_version": "1.0",
-                            "method": result.get("analysis_method", "EmotionEvaluator"),
-                            "platform": "Vercel Serverless",
-                        },
-                    }
+                    formatted_result = build_response(
+                        SENTIMENT_INDEX.get(sentiment, UNKNOWN),
+                        result["confidence"],
+                        text,
+                        # Prefer the evaluator's own count over re-splitting
+                        result.get("word_count") or len(text.split()),
+                        result.get("analysis_method", "EmotionEvaluator"),
+                        label=sentiment,
+                    )
                 else:
                     formatted_result = result
             else:
                 # Use simple fallback analyzer
-                simple_analyzer = SimpleSentimentAnalyzer()
-                formatted_result = simple_analyzer.analyze_text(text)
-                formatted_result["metadata"]["platform"] = "Vercel Serverless"
+                formatted_result = fallback_analyzer.analyze_text(text)
 
             self._send_json_response(formatted_result)
 
         except Exception as e:
+            self.close_connection = True
             error_data = {
                 "error": "Internal server error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
             }
             self._send_json_response(error_data, 500)
 
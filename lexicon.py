@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+lexicon.py - Shared word lists and scoring for the sentiment APIs
+=================================================================
+Imported by both analyze.py and app.py so the lists and scoring rules are
+defined once
+"""
+
+# Sentiment codes returned by sentiment_code()
+POSITIVE, NEGATIVE, NEUTRAL = range(3)
+
+POSITIVE_WORDS = frozenset(
+    {
+        "good",
+        "great",
+        "excellent",
+        "amazing",
+        "wonderful",
+        "fantastic",
+        "awesome",
+        "love",
+        "like",
+        "enjoy",
+        "happy",
+        "pleased",
+        "satisfied",
+        "delighted",
+        "perfect",
+        "outstanding",
+        "superb",
+        "brilliant",
+        "magnificent",
+        "terrific",
+        "best",
+        "favorite",
+        "recommend",
+        "impressed",
+        "beautiful",
+        "nice",
+        "positive",
+        "fresh",
+        "delicious",
+        "tasty",
+        "quality",
+        "fast",
+        "helpful",
+        "incredible",
+        "extraordinary",
+        "remarkable",
+        "spectacular",
+        "marvelous",
+        "phenomenal",
+        "splendid",
+    }
+)
+
+NEGATIVE_WORDS = frozenset(
+    {
+        "bad",
+        "terrible",
+        "awful",
+        "horrible",
+        "disgusting",
+        "hate",
+        "dislike",
+        "disappointed",
+        "unsatisfied",
+        "unhappy",
+        "angry",
+        "frustrated",
+        "annoyed",
+        "worst",
+        "poor",
+        "cheap",
+        "broken",
+        "defective",
+        "useless",
+        "waste",
+        "negative",
+        "slow",
+        "expensive",
+        "rude",
+        "dirty",
+        "stale",
+        "bland",
+        "bitter",
+        "sour",
+        "wrong",
+        "failed",
+        "problem",
+        "issue",
+        "complaint",
+        "disaster",
+        "dreadful",
+        "appalling",
+        "atrocious",
+        "deplorable",
+        "detestable",
+        "ghastly",
+        "hideous",
+        "loathsome",
+        "miserable",
+        "nasty",
+        "revolting",
+    }
+)
+
+# Merged lookup so each token is hashed once: +1 positive, -1 negative
+WORD_POLARITY = {
+    **dict.fromkeys(POSITIVE_WORDS, 1),
+    **dict.fromkeys(NEGATIVE_WORDS, -1),
+}
+
+
+def score_text(text):
+    """Count sentiment words; returns (positive, negative, word_count)"""
+    # islower() stops at the first uppercase character and allocates
+    # nothing, so already-lowercase input skips the lower() copy
+    words = (text if text.islower() else text.lower()).split()
+    # map/filter/count run entirely in C; only sentiment hits are kept
+    hits = list(filter(None, map(WORD_POLARITY.get, words)))
+    positive_count = hits.count(1)
+    return positive_count, len(hits) - positive_count, len(words)
+
+
+def sentiment_code(positive_count, negative_count, word_count):
+    """Classify word counts as POSITIVE, NEGATIVE or NEUTRAL"""
+    # Integer form of (positive - negative) / word_count vs. +/-0.05 (= 1/20)
+    balance = (positive_count - negative_count) * 20
+    if balance > word_count:
+        return POSITIVE
+    if balance < -word_count:
+        return NEGATIVE
+    return NEUTRAL